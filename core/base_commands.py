@@ -1,6 +1,4 @@
 from contextlib import contextmanager
-from functools import lru_cache
-import inspect
 import threading
 
 import sublime
@@ -54,10 +52,10 @@ class WithInputHandlers:
             args = {}
 
         present = args.keys()
-        for name in ordered_positional_args(self.run):  # type: ignore[attr-defined]
+        for name in positional_args_of_command(self.__class__):
             if name not in present and name in self.defaults:
                 sync_mode = Flag()
-                done = make_on_done_fn(
+                done = OnDone(
                     lambda: (
                         None
                         if sync_mode
@@ -74,14 +72,35 @@ class WithInputHandlers:
             return super().run_(edit_token, args)  # type: ignore[misc]
 
 
-@lru_cache()
-def ordered_positional_args(fn):
+def positional_args_of_command(cls):
+    # type: (type) -> List[str]
+    # Store the arguments directly on the command class after the first
+    # call.  Look into `__dict__` explicitly as subclasses must not inherit
+    # the value of their parent.
+    try:
+        return cls.__dict__["__gs_positional_args__"]
+    except KeyError:
+        rv = _positional_args_of_method(cls.run)  # type: ignore[attr-defined]
+        setattr(cls, "__gs_positional_args__", rv)
+        return rv
+
+
+def _positional_args_of_method(fn):
     # type: (Callable) -> List[str]
-    return [
-        name
-        for name, parameter in inspect.signature(fn).parameters.items()
-        if parameter.default is inspect.Parameter.empty
-    ]
+    # Read the code object directly as `inspect.signature` is
+    # comparatively slow.  Just like `signature` we follow `__wrapped__`
+    # for decorated functions.
+    while hasattr(fn, "__wrapped__"):
+        fn = fn.__wrapped__
+    code = fn.__code__
+    positional = code.co_varnames[:code.co_argcount]
+    positional = positional[:len(positional) - len(fn.__defaults__ or ())]
+    kwonly = code.co_varnames[code.co_argcount:code.co_argcount + code.co_kwonlyargcount]
+    kwdefaults = fn.__kwdefaults__ or {}
+    return (
+        list(positional[1:])  # skip `self`
+        + [name for name in kwonly if name not in kwdefaults]
+    )
 
 
 class Flag:
@@ -102,14 +121,23 @@ class Flag:
         return self._event.is_set()
 
 
-def make_on_done_fn(kont, args, name):
-    def on_done(value, **kwargs):
-        on_done.called = True  # type: ignore[attr-defined]
-        args[name] = value
-        args.update(kwargs)
-        kont()
-    on_done.called = False  # type: ignore[attr-defined]
-    return on_done
+class OnDone:
+    __slots__ = ("kont", "args", "name", "called")
+
+    def __init__(self, kont, args, name):
+        # type: (Callable[[], None], Args, str) -> None
+        self.kont = kont
+        self.args = args
+        self.name = name
+        self.called = False
+
+    def __call__(self, val, **kw):
+        # type: (object, object) -> None
+        self.called = True
+        self.args[self.name] = val
+        if kw:
+            self.args.update(kw)
+        self.kont()
 
 
 def run_command(cmd, args):
@@ -11,7 +11,7 @@ from ..git_command import GitCommand, GitSavvyError
 from ..runtime import enqueue_on_worker
 from ..ui_mixins.quick_panel import LogHelperMixin
 from ..utils import focus_view
-from ..view import replace_view_content
+from ..view import find_by_selector, replace_view_content
 from ...common import util
 from ...core.settings import SettingsMixin
 
@@ -30,8 +30,9 @@ __all__ = (
 
 MYPY = False
 if MYPY:
-    from typing import List, Optional, Tuple
+    from typing import Dict, List, Optional, Tuple
     from ..git_mixins.history import LogEntry
+    PedanticState = Tuple[int, int, int, int]
 
 
 COMMIT_HELP_TEXT_EXTRA = """##
@@ -67,6 +68,8 @@ THE_EMPTY_SHA = ""
 
 CONFIRM_ABORT = "Confirm to abort commit?"
 
+PEDANTIC_CACHE = {}  # type: Dict[sublime.ViewId, Tuple[PedanticState, Optional[int]]]
+
 
 def compute_identifier_for_view(view):
     # type: (sublime.View) -> Optional[Tuple]
@@ -142,23 +145,24 @@ class gs_commit(WindowCommand, GitCommand):
             else COMMIT_HELP_TEXT
         )
 
+        parts = []  # type: List[str]
         if amend:
-            last_commit_message = self.git("log", "-1", "--pretty=%B").strip()
-            initial_text = last_commit_message + help_text
+            parts.append(self.git("log", "-1", "--pretty=%B").strip())
         elif os.path.exists(merge_msg_path):
             with util.file.safe_open(merge_msg_path, "r") as f:
-                initial_text = f.read() + help_text
-        else:
-            initial_text = help_text
+                parts.append(f.read())
+        parts.append(help_text)
 
         commit_help_extra_file = self.savvy_settings.get("commit_help_extra_file") or ".commit_help"
         commit_help_extra_path = os.path.join(self.repo_path, commit_help_extra_file)
         if os.path.exists(commit_help_extra_path):
             with util.file.safe_open(commit_help_extra_path, "r", encoding="utf-8") as f:
-                initial_text += f.read()
+                parts.append(f.read())
 
-        replace_view_content(view, initial_text)
-        view.run_command("gs_prepare_commit_refresh_diff")
+        replace_view_content(view, "".join(parts))
+        # Computing the diff can take a while for big changes.  Show the
+        # message area immediately and let the worker fill in the diff.
+        view.run_command("gs_prepare_commit_refresh_diff", {"sync": False})
 
 
 class gs_prepare_commit_refresh_diff(TextCommand, GitCommand):
@@ -286,22 +290,50 @@ class GsPedanticEnforceEventListener(EventListener, SettingsMixin):
         self.body_line_limit = self.savvy_settings.get('pedantic_commit_message_line_length')
         self.warning_length = self.savvy_settings.get('pedantic_commit_warning_length')
 
-        self.comment_start_region = self.view.find_by_selector("meta.dropped.git.commit")
-        self.first_comment_line = None
-        if self.comment_start_region:
-            self.first_comment_line = self.view.rowcol(self.comment_start_region[0].begin())[0]
+        # Most of the time only the cursor moved.  Only if the buffer (or the
+        # limits) changed we need to scan the message for too long lines again.
+        state = (view.change_count(), self.first_line_limit, self.body_line_limit, self.warning_length)
+        try:
+            previous_state, self.first_comment_line = PEDANTIC_CACHE[view.id()]
+        except KeyError:
+            previous_state = None
+        buffer_changed = state != previous_state
+
+        if buffer_changed:
+            self.comment_start_region = self.view.find_by_selector("meta.dropped.git.commit")
+            self.first_comment_line = None
+            if self.comment_start_region:
+                self.first_comment_line = self.view.rowcol(self.comment_start_region[0].begin())[0]
+            PEDANTIC_CACHE[view.id()] = (state, self.first_comment_line)
 
         if self.savvy_settings.get('pedantic_commit_ruler'):
             self.view.settings().set("rulers", self.find_rulers())
 
+        if not buffer_changed:
+            return
+
         warning, illegal = self.find_too_long_lines()
-        self.view.add_regions(
+        self.apply_regions(
             'make_commit_warning', warning,
             scope='invalid.deprecated.line-too-long.git-commit', flags=sublime.DRAW_NO_FILL)
-        self.view.add_regions(
+        self.apply_regions(
             'make_commit_illegal', illegal,
             scope='invalid.deprecated.line-too-long.git-commit')
 
+    def apply_regions(self, key, regions, **kwargs):
+        # type: (str, List[sublime.Region], object) -> None
+        # Only redraw if the regions actually changed.  Compare with what
+        # Sublime currently shows as it moves regions on edits itself.
+        if self.view.get_regions(key) == regions:
+            return
+        if regions:
+            self.view.add_regions(key, regions, **kwargs)
+        else:
+            self.view.erase_regions(key)
+
+    def on_close(self, view):
+        PEDANTIC_CACHE.pop(view.id(), None)
+
     def find_rulers(self):
         on_first_line = False
         on_message_body = False
@@ -355,15 +387,25 @@ class GsPedanticEnforceEventListener(EventListener, SettingsMixin):
         else:
             body_region = sublime.Region(self.view.text_point(2, 0), self.view.size())
 
-        for line in self.view.lines(body_region):
-            length = line.b - line.a
+        # Fetch the body once and compute the line spans ourselves instead
+        # of asking Sublime for a `Region` per line.
+        text = self.view.substr(body_region)
+        base = body_region.a
+        i, end = 0, len(text)
+        while i <= end:
+            j = text.find("\n", i)
+            if j == -1:
+                j = end
+            length = j - i
+            line_a, line_b = base + i, base + j
             if length > self.body_line_limit:
                 warning_lines.append(sublime.Region(
-                    line.a + self.body_line_limit,
-                    min(line.a + self.body_line_limit + self.warning_length, line.b)))
+                    line_a + self.body_line_limit,
+                    min(line_a + self.body_line_limit + self.warning_length, line_b)))
 
             if self.body_line_limit + self.warning_length < length:
-                illegal_lines.append(sublime.Region(line.a + self.body_line_limit + self.warning_length, line.b))
+                illegal_lines.append(sublime.Region(line_a + self.body_line_limit + self.warning_length, line_b))
+            i = j + 1
 
         return [warning_lines, illegal_lines]
 
@@ -381,7 +423,7 @@ def extract_commit_subject(view):
 def extract_first_region(view, selector):
     # type: (sublime.View, str) -> str
     try:
-        region = view.find_by_selector(selector)[0]
+        region = find_by_selector(view, selector)[0]
     except IndexError:
         return ""
 
@@ -500,16 +542,34 @@ class gs_commit_view_sign(TextCommand, GitCommand):
     """
 
     def run(self, edit):
-        config_name = self.git("config", "user.name").strip()
-        config_email = self.git("config", "user.email").strip()
-        commit_message = extract_commit_message(self.view)
+        enqueue_on_worker(self.run_impl)
+
+    def run_impl(self):
+        view = self.view
+        # Read name and email with just one call to git
+        config = {}  # type: Dict[str, str]
+        for line in self.git("config", "--get-regexp", r"^user\.(name|email)$").splitlines():
+            key, _, value = line.partition(" ")
+            config[key] = value
+        # If a key is missing, ask for it explicitly, so that git fails
+        # and tells the user to set up their identity.
+        config_name = (
+            config["user.name"] if "user.name" in config
+            else self.git("config", "user.name")
+        ).strip()
+        config_email = (
+            config["user.email"] if "user.email" in config
+            else self.git("config", "user.email")
+        ).strip()
+        try:
+            region = find_by_selector(view, "meta.commit.message")[0]
+        except IndexError:
+            region = sublime.Region(0)
+        commit_message = view.substr(region)
 
         sign_text = COMMIT_SIGN_TEXT.format(name=config_name, email=config_email)
         new_commit_message = commit_message.rstrip() + sign_text + "\n"
-
-        view_text = self.view.substr(sublime.Region(0, self.view.size()))
-        new_view_text = new_commit_message + view_text[len(commit_message):]
-        replace_view_content(self.view, new_view_text)
+        replace_view_content(view, new_commit_message, region)
 
 
 class gs_commit_view_close(TextCommand, GitCommand):
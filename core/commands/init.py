@@ -6,7 +6,7 @@ from sublime_plugin import WindowCommand
 
 from GitSavvy.core.fns import filter_, maybe
 from GitSavvy.core.runtime import enqueue_on_worker
-from ..git_command import GitCommand
+from ..git_command import GitCommand, no_repo_paths
 from ...common import util
 from ..ui_mixins.input_panel import show_single_line_input_panel
 
@@ -95,6 +95,7 @@ class gs_init(WindowCommand, GitCommand):
         if not path:
             return
         self.git("init", working_dir=path)
+        no_repo_paths.clear()
         self.window.status_message(
             "{word_start}nitialized repo successfully.".format(
                 word_start="Re-i" if re_init else "I"
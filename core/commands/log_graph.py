@@ -1784,7 +1784,7 @@ def dot_from_line(view, line):
     return None
 
 
-ACTIVE_COMPUTATION = Cache()
+ACTIVE_COMPUTATION = Cache()  # only used on the UI thread
 
 
 @lru_cache(maxsize=1)
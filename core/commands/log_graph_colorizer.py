@@ -2,7 +2,7 @@ from collections import deque
 
 import sublime
 
-from GitSavvy.core.utils import Cache
+from GitSavvy.core.utils import LockedCache
 
 MYPY = False
 if MYPY:
@@ -150,7 +150,7 @@ class NullChar_(Char):
 NullChar = NullChar_()
 down_handlers = {}  # type: Dict[str, NextFn]
 up_handlers = {}  # type: Dict[str, NextFn]
-PATH_CACHE = Cache()  # type: MutableMapping[Tuple[Char, Direction], List[Char]]
+PATH_CACHE = LockedCache()  # type: MutableMapping[Tuple[Char, Direction], List[Char]]
 
 
 # Notes:
@@ -1,12 +1,13 @@
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
 import sublime
 import sublime_plugin
 
 from . import log_graph
-from ..fns import pairwise, peek
 from ..parse_diff import Region, TextRange
 from ..runtime import throttled
 from ..utils import flash
-from ..view import find_by_selector
 
 
 __all__ = (
@@ -43,39 +44,43 @@ class CopyIntercepterForGraph(sublime_plugin.EventListener):
         cursor = frozen_sel[0].a
         line_span = view.line(cursor)
 
-        def candidates():
-            # type: () -> Iterator[Tuple[str, List[Region]]]
-            commit_hash = read_commit_hash(view, line_span)
-            if commit_hash:
-                yield commit_hash.text, [commit_hash.region()]
+        # Lines without a commit hash do not carry decorations or a
+        # message either.  Bail out before doing any of the more
+        # expensive work, e.g. reading the clipboard or scanning scopes.
+        commit_hash = read_commit_hash(view, line_span)
+        if not commit_hash:
+            return None
+
+        def candidates(commit_hash):
+            # type: (TextRange) -> Iterator[Tuple[str, List[Region]]]
+            yield commit_hash.text, [commit_hash.region()]
             for d in read_commit_decoration(view, line_span):
                 yield d.text, [d.region()]
             commit_msg = read_commit_message(view, line_span)
             if commit_msg:
                 yield commit_msg.text, [commit_msg.region()]
-            if commit_hash and commit_msg:
                 yield (
                     "{} ({})".format(commit_hash.text, commit_msg.text),
                     [commit_hash.region(), commit_msg.region()]
                 )
 
+        candidates_ = candidates(commit_hash)
+        first = next(candidates_)
         clip_content = sublime.get_clipboard(128)
-        try:
-            first, candidates_ = peek(candidates())
-        except StopIteration:
-            return None
-
         if not clip_content:
             set_clipboard_and_flash(view, *first)
             return "noop"
 
-        for left, right in pairwise(candidates_):
-            if left[0] == clip_content:
-                set_clipboard_and_flash(view, *right)
-                return "noop"
-        else:
-            set_clipboard_and_flash(view, *first)
-            return "noop"
+        # Cycle through the candidates, t.i. copy the one after the
+        # current clipboard content, or start over with the first one.
+        all_candidates = [first] + list(candidates_)
+        idx = next(
+            (i for i, (text, _) in enumerate(all_candidates) if text == clip_content),
+            None
+        )
+        target = all_candidates[(idx + 1) % len(all_candidates)] if idx is not None else first
+        set_clipboard_and_flash(view, *target)
+        return "noop"
 
 
 def set_clipboard_and_flash(view, text, regions):
@@ -96,22 +101,37 @@ def read_commit_hash(view, line_span):
 
 def read_commit_decoration(view, line_span):
     # type: (sublime.View, sublime.Region) -> Iterator[TextRange]
-    for r in find_by_selector(view, "constant.other.git.branch.git-savvy"):
-        if r.a > line_span.b:
-            break
-        if line_span.contains(r):
-            yield TextRange(view.substr(r), r.a, r.b)
+    for r in find_by_selector_on_line(view, line_span, "constant.other.git.branch.git-savvy"):
+        yield TextRange(view.substr(r), r.a, r.b)
 
 
 def read_commit_message(view, line_span):
     # type: (sublime.View, sublime.Region) -> Optional[TextRange]
-    for r in find_by_selector(view, "meta.graph.message.git-savvy"):
-        if line_span.contains(r):
-            return TextRange(view.substr(r), r.a, r.b)
+    for r in find_by_selector_on_line(view, line_span, "meta.graph.message.git-savvy"):
+        return TextRange(view.substr(r), r.a, r.b)
     else:
         return None
 
 
+def find_by_selector_on_line(view, line_span, selector):
+    # type: (sublime.View, sublime.Region, str) -> List[sublime.Region]
+    # `find_by_selector` returns the regions sorted, so we can bisect
+    # to the given line instead of walking from the top of the view.
+    regions, starts = _regions_and_starts(view.id(), view.change_count(), selector)
+    lo = bisect_left(starts, line_span.a)
+    hi = bisect_right(starts, line_span.b, lo)
+    return [r for r in regions[lo:hi] if line_span.contains(r)]
+
+
+@lru_cache(maxsize=16)
+def _regions_and_starts(vid, _cc, selector):
+    # type: (sublime.ViewId, int, str) -> Tuple[List[sublime.Region], Tuple[int, ...]]
+    # Compute both from the same snapshot as the view might get
+    # redrawn on the worker meanwhile.
+    regions = sublime.View(vid).find_by_selector(selector)
+    return regions, tuple(r.a for r in regions)
+
+
 def flash_copied_regions(view, regions):
     # type: (sublime.View, List[Region]) -> None
     region_key = HIGHLIGHT_REGION_KEY.format("flash_copied_regions")
@@ -1,4 +1,5 @@
 from functools import partial
+import time
 
 import sublime
 
@@ -20,7 +21,7 @@ __all__ = (
 
 MYPY = False
 if MYPY:
-    from typing import Dict, Sequence, TypeVar
+    from typing import Dict, Sequence, Tuple, TypeVar
     from GitSavvy.core.base_commands import Args, GsCommand, Kont
     T = TypeVar("T")
 
@@ -29,6 +30,9 @@ END_PUSH_MESSAGE = "Push complete."
 CONFIRM_FORCE_PUSH = ("You are about to `git push {}`. Would you  "
                       "like to proceed?")
 
+PUSHDEFAULTS_TTL = 60  # seconds
+PUSHDEFAULTS_CACHE = {}  # type: Dict[str, Tuple[float, Dict[str, str]]]
+
 
 class PushBase(GsWindowCommand):
     def guess_remote_to_push_to(self, available_remotes):
@@ -42,8 +46,28 @@ class PushBase(GsWindowCommand):
         if last_remote_used in available_remotes:
             return last_remote_used  # type: ignore[return-value]
 
-        defaults = dict(
-            (key[:-12], val)  # strip trailing ".pushdefault" from key
+        defaults = self.load_pushdefaults()
+        for key in (defaults.get("gitsavvy"), defaults.get("remote"), "fork", "origin"):
+            if key in available_remotes:
+                return key  # type: ignore[return-value]
+        return next(iter(available_remotes))
+
+    def load_pushdefaults(self):
+        # type: () -> Dict[str, str]
+        # The "pushdefault" config rarely changes, so we can save spawning
+        # `git config` on every push for a while.
+        repo_path = self.repo_path
+        now = time.monotonic()
+        try:
+            timestamp, defaults = PUSHDEFAULTS_CACHE[repo_path]
+        except KeyError:
+            pass
+        else:
+            if now - timestamp < PUSHDEFAULTS_TTL:
+                return defaults
+
+        defaults = {
+            key[:-12]: val  # strip trailing ".pushdefault" from key
             for key, val in (
                 line.split()
                 for line in self.git(
@@ -52,12 +76,11 @@ class PushBase(GsWindowCommand):
                     r".*\.pushdefault",
                     throw_on_error=False
                 ).splitlines()
+                if line
             )
-        )  # type: Dict[str, str]
-        for key in (defaults.get("gitsavvy"), defaults.get("remote"), "fork", "origin"):
-            if key in available_remotes:
-                return key  # type: ignore[return-value]
-        return next(iter(available_remotes))
+        }
+        PUSHDEFAULTS_CACHE[repo_path] = (now, defaults)
+        return defaults
 
     def do_push(
         self,
@@ -6,16 +6,20 @@ Define a base command class that:
      for Git operations.
 """
 
-from collections import deque, ChainMap
+import codecs
+from collections import deque
+from concurrent.futures import Future
 import io
-from itertools import chain, repeat
-from functools import partial
+import json
+from functools import lru_cache, partial
 import locale
 import os
 import re
+import select
 import shutil
 import stat
 import subprocess
+import threading
 import time
 import traceback
 
@@ -30,12 +34,16 @@ from GitSavvy.core.utils import paths_upwards, resolve_path
 
 MYPY = False
 if MYPY:
-    from typing import Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+    from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 
-git_path = None
+git_path = None  # type: Optional[str]
 error_message_displayed = False
 repo_paths = {}  # type: Dict[str, str]
+# Folders we found no repo for, and when.  A repo can be created at
+# any time, so only trust a negative result for a short while.
+no_repo_paths = {}  # type: Dict[str, float]
+NO_REPO_PATHS_TTL = 5  # seconds
 git_dirs = {}  # type: Dict[str, str]
 
 DECODE_ERROR_MESSAGE = """
@@ -50,6 +58,7 @@ MIN_GIT_VERSION = (2, 18, 0)
 GIT_TOO_OLD_MSG = "Your Git version is too old. GitSavvy requires {:d}.{:d}.{:d} or above."
 
 NOT_SET = "<NOT_SET>"
+BYTES_HAS_ISASCII = hasattr(bytes, "isascii")
 
 
 def communicate_and_log(proc, stdin, log):
@@ -66,16 +75,24 @@ def communicate_and_log(proc, stdin, log):
         proc.stdin.flush()
         proc.stdin.close()
 
-    stdout, stderr = b'', b''
+    out_chunks, err_chunks = [], []  # type: Tuple[List[bytes], List[bytes]]
     for line in stream_stdout_and_err(proc):
         if isinstance(line, Out):
-            stdout += line
+            out_chunks.append(line)
             log(line)
         elif isinstance(line, Err):
-            stderr += line
+            err_chunks.append(line)
             log(line)
 
-    return stdout, stderr
+    return b''.join(out_chunks), b''.join(err_chunks)
+
+
+def codec_name(encoding):
+    # type: (str) -> str
+    try:
+        return codecs.lookup(encoding).name
+    except (LookupError, TypeError):
+        return encoding
 
 
 class Out(bytes): pass  # noqa: E701
@@ -90,25 +107,90 @@ def read_linewise(fh, kont):
 
 def stream_stdout_and_err(proc):
     # type: (subprocess.Popen) -> Iterator[bytes]
-    container = deque()  # type: Deque[bytes]
-    append = container.append
-    out_f = run_as_future(read_linewise, proc.stdout, lambda line: append(Out(line)))
-    err_f = run_as_future(read_linewise, proc.stderr, lambda line: append(Err(line)))
-    delay = chain([1, 2, 4, 8, 15, 30], repeat(50))
+    if os.name == "nt" or not hasattr(select, "poll"):
+        # `select` only works on sockets on Windows
+        return _stream_stdout_and_err_threaded(proc)
+    return _stream_stdout_and_err_poll(proc)
+
+
+def _stream_stdout_and_err_poll(proc):
+    # type: (subprocess.Popen) -> Iterator[bytes]
+    # Read raw from the file descriptors to not block on a partial line
+    # which might sit in the buffer of the file object.  Note that we use
+    # `poll` as `select` can't handle fds >= FD_SETSIZE.
+    kinds = {
+        proc.stdout.fileno(): Out,  # type: ignore[union-attr]
+        proc.stderr.fileno(): Err,  # type: ignore[union-attr]
+    }  # type: Dict[int, Callable[[bytes], bytes]]
+    # Collect chunks without a newline in lists, concatenating them
+    # on every read would be quadratic for e.g. `-z` output.
+    pending = {fd: [] for fd in kinds}  # type: Dict[int, List[bytes]]
+    poller = select.poll()
+    for fd in kinds:
+        poller.register(fd, select.POLLIN)
 
     with proc:
-        while out_f.running() or err_f.running():
-            try:
-                yield container.popleft()
-            except IndexError:
-                time.sleep(next(delay) / 1000)
+        while kinds:
+            for fd, _ in poller.poll():
+                if fd not in kinds:
+                    continue
+                chunk = os.read(fd, 32768)
+                kind = kinds[fd]
+                if not chunk:
+                    poller.unregister(fd)
+                    del kinds[fd]
+                    if pending[fd]:
+                        yield kind(b"".join(pending[fd]))
+                    continue
+
+                pending[fd].append(chunk)
+                if b"\n" not in chunk:
+                    continue
+                lines = b"".join(pending[fd]).split(b"\n")
+                rest = lines.pop()
+                pending[fd] = [rest] if rest else []
+                for line in lines:
+                    yield kind(line + b"\n")
+
+
+def _stream_stdout_and_err_threaded(proc):
+    # type: (subprocess.Popen) -> Iterator[bytes]
+    container = deque()  # type: Deque[Union[bytes, Future[None]]]
+    cond = threading.Condition()
+
+    def put(item):
+        # type: (Union[bytes, Future[None]]) -> None
+        with cond:
+            container.append(item)
+            cond.notify()
+
+    out_f = run_as_future(read_linewise, proc.stdout, lambda line: put(Out(line)))
+    err_f = run_as_future(read_linewise, proc.stderr, lambda line: put(Err(line)))
+    # The futures themselves mark the end of their stream.
+    out_f.add_done_callback(put)
+    err_f.add_done_callback(put)
+
+    with proc:
+        running = 2
+        while running:
+            # Take everything that piled up in one go, and yield
+            # outside of the lock.
+            with cond:
+                while not container:
+                    cond.wait()
+                batch = list(container)
+                container.clear()
+
+            for item in batch:
+                if isinstance(item, Future):
+                    running -= 1
+                else:
+                    yield item
 
     # Check and raise exceptions if any
     out_f.result()
     err_f.result()
 
-    yield from container
-
 
 STARTUPINFO = None
 if os.name == "nt":
@@ -170,6 +252,37 @@ def search_for_git_toplevel(start_folder):
 
 
 def git_version_from_path(git_path):
+    # type: (str) -> Optional[Tuple[int, ...]]
+    # Spawning `git --version` is comparatively slow, esp. on Windows, and
+    # we do it on every start of Sublime.  Remember the version on disk as
+    # long as the binary itself doesn't change.
+    try:
+        st = os.stat(git_path)
+    except OSError:
+        return _git_version_from_path(git_path)
+
+    cache_key = [git_path, st.st_mtime, st.st_size]
+    cache_file = os.path.join(sublime.cache_path(), "GitSavvy", "git_version.json")
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["key"] == cache_key:
+            return tuple(cached["version"])
+    except Exception:
+        pass
+
+    version = _git_version_from_path(git_path)
+    if version:
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump({"key": cache_key, "version": version}, f)
+        except Exception:
+            pass
+    return version
+
+
+def _git_version_from_path(git_path):
     # type: (str) -> Optional[Tuple[int, ...]]
     try:
         stdout = subprocess.check_output(
@@ -190,7 +303,19 @@ def git_version_from_path(git_path):
 
 def is_subpath(topfolder, path):
     # type: (str, str) -> bool
-    return os.path.commonprefix([topfolder, path]) == topfolder
+    # Compare on path boundaries; `/foo` is not the topfolder of `/foobar`.
+    topfolder = os.path.normpath(topfolder)
+    path = os.path.normpath(path)
+    return path == topfolder or path.startswith(os.path.join(topfolder, ""))
+
+
+@lru_cache(maxsize=1024)
+def rel_path_in_repo(fpath, repo_path):
+    # type: (str, str) -> str
+    rel_path = os.path.relpath(resolve_path(fpath), start=resolve_path(repo_path))
+    if os.name == "nt":
+        return rel_path.replace("\\", "/")
+    return rel_path
 
 
 class _GitCommand(SettingsMixin):
@@ -224,8 +349,8 @@ class _GitCommand(SettingsMixin):
         """
         window = self.some_window()
         final_args = self._add_global_flags(git_cmd, list(args))
-        command = [self.git_binary_path] + list(filter_(final_args))
-        command_str = util.debug.pretty_git_command(command[1:])
+        command = [self.git_binary_path]
+        command.extend(filter_(final_args))
 
         if show_panel is None:
             show_panel = git_cmd in self.savvy_settings.get("show_panel_for")
@@ -233,7 +358,7 @@ class _GitCommand(SettingsMixin):
         if show_panel:
             panel = util.log.init_panel(window)
             log = partial(util.log.append_to_panel, panel)
-            log("$ {}\n".format(command_str))
+            log("$ {}\n".format(util.debug.pretty_git_command(command[1:])))
 
         if not working_dir:
             try:
@@ -245,11 +370,13 @@ class _GitCommand(SettingsMixin):
                 raise GitSavvyError(str(e), show_panel=show_panel_on_error, window=window)
 
         stdout, stderr = None, None
-        environ = ChainMap(
-            custom_environ or {},
-            self.savvy_settings.get("env") or {},
-            os.environ
-        )
+        # Build a flat dict as `Popen` iterates over the mapping, and iterating
+        # a `ChainMap` is slow.  `os.environ` itself is not cached as other
+        # plugins may modify it at runtime.
+        environ = os.environ.copy()
+        environ.update(self.savvy_settings.get("env") or {})
+        if custom_environ:
+            environ.update(custom_environ)
         try:
             start = time.time()
             p = subprocess.Popen(
@@ -279,7 +406,8 @@ class _GitCommand(SettingsMixin):
             raise GitSavvyError(
                 "$ {} ({})\n\n"
                 "Please report this error to GitSavvy:\n\n{}\n\n{}".format(
-                    command_str, working_dir, e, traceback.format_exc()
+                    util.debug.pretty_git_command(command[1:]),
+                    working_dir, e, traceback.format_exc()
                 ),
                 cmd=command,
                 show_panel=show_panel_on_error,
@@ -294,14 +422,17 @@ class _GitCommand(SettingsMixin):
                     log("\n[Done in {:.2f}s]".format(end - start))
 
         if decode:
+            # `strict_decode` only looks up the other encodings (and thus
+            # reads the settings) if utf-8 fails.
             try:
-                stdout, stderr = self.strict_decode(stdout), self.strict_decode(stderr)  # type: ignore[assignment]
+                stdout = self.strict_decode(stdout)  # type: ignore[assignment]
+                stderr = self.strict_decode(stderr)  # type: ignore[assignment]
             except UnicodeDecodeError:
                 stdout_s = stdout.decode("utf-8", "replace")
                 stderr_s = stderr.decode("utf-8", "replace")
                 raise GitSavvyError(
                     "$ {}\n{}{}{}".format(
-                        command_str,
+                        util.debug.pretty_git_command(command[1:]),
                         DECODE_ERROR_MESSAGE,
                         stdout_s,
                         stderr_s,
@@ -322,7 +453,7 @@ class _GitCommand(SettingsMixin):
 
             raise GitSavvyError(
                 "$ {}\n\n{}{}".format(
-                    command_str,
+                    util.debug.pretty_git_command(command[1:]),
                     stdout_s,
                     (
                         "<no output, exit code: {}>".format(p.returncode)
@@ -341,6 +472,15 @@ class _GitCommand(SettingsMixin):
 
         return stdout
 
+    def git_many(self, *commands, **kwargs):
+        # type: (Sequence[Optional[str]], Any) -> List[Any]
+        """
+        Run multiple independent git commands concurrently and return
+        their results in order.  `kwargs` are passed to each `git` call.
+        """
+        futures = [run_as_future(self.git, *command, **kwargs) for command in commands]
+        return [future.result() for future in futures]
+
     def git_throwing_silently(self, *args, **kwargs):
         return self.git(
             *args,
@@ -359,7 +499,23 @@ class _GitCommand(SettingsMixin):
 
     def strict_decode(self, input):
         # type: (bytes) -> str
-        encodings = self.get_encoding_candidates()
+        # Fast path: most of git's output is pure ASCII, for which
+        # the ascii codec is the cheapest.  (Python 3.7+ only)
+        if BYTES_HAS_ISASCII and input.isascii():
+            return input.decode('ascii')
+        # utf-8 is the first candidate and almost always succeeds, so
+        # don't compute the other candidates up front.
+        try:
+            return input.decode('utf-8')
+        except UnicodeDecodeError as err:
+            utf8_error = err
+        encodings = [
+            encoding
+            for encoding in self.get_encoding_candidates()[1:]
+            if codec_name(encoding) != 'utf-8'
+        ]
+        if not encodings:
+            raise utf8_error
         decoded, _ = self.try_decode(input, encodings)
         return decoded
 
@@ -378,12 +534,24 @@ class _GitCommand(SettingsMixin):
 
     def try_decode(self, input, encodings):
         # type: (bytes, Sequence[str]) -> Tuple[str, str]
-        for n, encoding in enumerate(encodings, start=1):
+        # ASCII decodes the same with all of our candidates.
+        if BYTES_HAS_ISASCII and encodings and input.isascii():
+            return input.decode('ascii'), encodings[0]
+        # Walk the input only once per distinct codec; "UTF-8", "utf8",
+        # and "utf-8" e.g. all name the same codec.
+        seen = set()  # type: Set[str]
+        last_error = None  # type: Optional[UnicodeDecodeError]
+        for encoding in encodings:
+            name = codec_name(encoding)
+            if name in seen:
+                continue
+            seen.add(name)
             try:
                 return input.decode(encoding), encoding
             except UnicodeDecodeError as err:
-                if n == len(encodings):
-                    raise err
+                last_error = err
+        if last_error:
+            raise last_error
         assert False  # no silent fall-through
 
     @property
@@ -393,32 +561,34 @@ class _GitCommand(SettingsMixin):
         """
 
         global git_path, error_message_displayed
-        if not git_path:
-            git_path_setting = self.savvy_settings.get("git_path")
-            if isinstance(git_path_setting, dict):
-                git_path = git_path_setting.get(sublime.platform())
-                if not git_path:
-                    git_path = git_path_setting.get('default')
-            else:
-                git_path = git_path_setting
+        if git_path:
+            return git_path
 
+        git_path_setting = self.savvy_settings.get("git_path")
+        if isinstance(git_path_setting, dict):
+            git_path = git_path_setting.get(sublime.platform())
             if not git_path:
-                git_path = shutil.which("git")
-
-            if git_path:
-                util.debug.dprint("git executable: {}".format(git_path))
-                version = git_version_from_path(git_path)
-                if version:
-                    util.debug.dprint("git version: {}".format(version))
-                    if version < MIN_GIT_VERSION:
-                        msg = GIT_TOO_OLD_MSG.format(*MIN_GIT_VERSION)
-                        git_path = None
-                        if not error_message_displayed:
-                            sublime.error_message(msg)
-                            error_message_displayed = True
-                        raise ValueError("Git binary too old.")
-                else:
+                git_path = git_path_setting.get('default')
+        else:
+            git_path = git_path_setting
+
+        if not git_path:
+            git_path = shutil.which("git")
+
+        if git_path:
+            util.debug.dprint("git executable: {}".format(git_path))
+            version = git_version_from_path(git_path)
+            if version:
+                util.debug.dprint("git version: {}".format(version))
+                if version < MIN_GIT_VERSION:
+                    msg = GIT_TOO_OLD_MSG.format(*MIN_GIT_VERSION)
                     git_path = None
+                    if not error_message_displayed:
+                        sublime.error_message(msg)
+                        error_message_displayed = True
+                    raise ValueError("Git binary too old.")
+            else:
+                git_path = None
 
         if not git_path:
             msg = ("Your Git binary cannot be found.  If it is installed, add it "
@@ -452,27 +622,25 @@ class _GitCommand(SettingsMixin):
         except AttributeError:
             return self.window.extract_variables().get("file")  # type: ignore[attr-defined]
 
-    def _search_paths(self):
-        # type: () -> Iterator[str]
-        def __search_paths():
-            # type: () -> Iterator[str]
-            file_name = self._current_filename()
+    def _search_paths(self, file_name, folders):
+        # type: (Optional[str], List[str]) -> Iterator[str]
+        def __search_paths(file_name):
+            # type: (Optional[str]) -> Iterator[str]
             if file_name and not os.path.isfile(file_name):
                 file_name = None
             if file_name:
                 yield os.path.dirname(file_name)
 
-            window = self._current_window()
-            if window:
-                folders = window.folders()
-                if folders:
-                    if (
-                        not file_name
-                        or not is_subpath(resolve_path(folders[0]), resolve_path(file_name))
-                    ):
-                        yield folders[0]
+            if folders:
+                if (
+                    not file_name
+                    or not is_subpath(resolve_path(folders[0]), resolve_path(file_name))
+                ):
+                    yield folders[0]
+
+        return filter(os.path.isdir, __search_paths(file_name))
 
-        return filter(os.path.isdir, __search_paths())
+    _repo_path_memo = None  # type: Optional[Tuple[Tuple[Optional[str], Optional[str]], str]]
 
     def find_repo_path(self):
         # type: () -> Optional[str]
@@ -481,20 +649,45 @@ class _GitCommand(SettingsMixin):
         if repo_path and os.path.exists(repo_path):
             return repo_path
 
-        return next(filter_(map(self._find_git_toplevel, self._search_paths())), None)
+        file_name = self._current_filename()
+        window = self._current_window()
+        folders = window.folders() if window else []
+        # Remember the repo we found for this file and window folder on
+        # the instance so that repeated `self.repo_path` lookups during a
+        # command don't hit the file system again.
+        key = (file_name, folders[0] if folders else None)
+        if self._repo_path_memo and self._repo_path_memo[0] == key:
+            return self._repo_path_memo[1]
+
+        repo_path = next(
+            filter_(map(self._find_git_toplevel, self._search_paths(file_name, folders))),
+            None
+        )
+        if repo_path:
+            self._repo_path_memo = (key, repo_path)
+        return repo_path
 
     def _find_git_toplevel(self, folder):
         # type: (str) -> Optional[str]
         try:
             return repo_paths[folder]
         except KeyError:
-            repo_path = search_for_git_toplevel(folder)
-            if repo_path:
-                util.debug.dprint("repo path:", os.path.join(repo_path, ".git"))
-                repo_paths[folder] = repo_path
-            else:
-                util.debug.dprint("found no .git path for {}".format(folder))
-            return repo_path
+            pass
+
+        now = time.monotonic()
+        searched_at = no_repo_paths.get(folder)
+        if searched_at is not None and now - searched_at < NO_REPO_PATHS_TTL:
+            return None
+
+        repo_path = search_for_git_toplevel(folder)
+        if repo_path:
+            util.debug.dprint("repo path:", os.path.join(repo_path, ".git"))
+            repo_paths[folder] = repo_path
+            no_repo_paths.pop(folder, None)
+        else:
+            util.debug.dprint("found no .git path for {}".format(folder))
+            no_repo_paths[folder] = now
+        return repo_path
 
     def get_repo_path(self):
         # type: () -> str
@@ -569,10 +762,7 @@ class _GitCommand(SettingsMixin):
         """
         fpath = self.file_path if abs_path is NOT_SET else abs_path
         assert fpath
-        rel_path = os.path.relpath(resolve_path(fpath), start=resolve_path(self.repo_path))
-        if os.name == "nt":
-            return rel_path.replace("\\", "/")
-        return rel_path
+        return rel_path_in_repo(fpath, self.repo_path)
 
     def _add_global_flags(self, git_cmd, args):
         # type: (str, List[Optional[str]]) -> List[str]
@@ -580,8 +770,9 @@ class _GitCommand(SettingsMixin):
         Transforms the Git command arguments with flags indicated in the
         global GitSavvy settings.
         """
-        global_pre_flags = self.savvy_settings.get("global_pre_flags", {}).get(git_cmd, [])
-        global_flags = self.savvy_settings.get("global_flags", {}).get(git_cmd, [])
+        settings = self.savvy_settings
+        global_pre_flags = settings.get("global_pre_flags", {}).get(git_cmd, [])
+        global_flags = settings.get("global_flags", {}).get(git_cmd, [])
         return global_pre_flags + [git_cmd] + global_flags + args
 
 
@@ -125,8 +125,11 @@ class MergeMixin(mixin_base):
         #        ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
         base_hash, ours_hash, theirs_hash = (entry.split(" ")[1] for entry in entries)
 
-        base_content = self.git("show", base_hash, decode=False)
-        ours_content = self.git("show", ours_hash, decode=False)
-        theirs_content = self.git("show", theirs_hash, decode=False)
+        base_content, ours_content, theirs_content = self.git_many(
+            ("show", base_hash),
+            ("show", ours_hash),
+            ("show", theirs_hash),
+            decode=False
+        )
 
         return base_content, ours_content, theirs_content
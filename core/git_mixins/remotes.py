@@ -32,8 +32,16 @@ class RemotesMixin(mixin_base):
         Get a list of remotes, provided as tuples of remote name and remote
         url/resource.
         """
-        entries = self.git("remote", "-v").splitlines()
-        return OrderedDict(entry.split()[:2] for entry in entries)
+        # `remote -v` lists each remote twice, first with its fetch, then
+        # with its push url.  We report the fetch url.
+        # Note: `OrderedDict` as Sublime Text 3's Python 3.3 has unordered
+        # plain dicts.
+        remotes = OrderedDict()  # type: Dict[name, url]
+        for entry in self.git("remote", "-v").splitlines():
+            remote_name, _, rest = entry.partition("\t")
+            if remote_name not in remotes:
+                remotes[remote_name] = rest.partition(" ")[0]
+        return remotes
 
     def fetch(self, remote=None, refspec=None, prune=True, local_branch=None, remote_branch=None):
         # type: (str, str, bool, str, str) -> None
@@ -62,6 +70,7 @@ class RemotesMixin(mixin_base):
             "--prune" if prune else None,
             remote if remote else "--all",
             refspec or None,
+            decode=False
         )
 
     def pull(self, remote=None, remote_branch=None, rebase=False):
@@ -89,14 +98,16 @@ class RemotesMixin(mixin_base):
         perform default `git push`.
         """
         # Do not return the output. It is always empty since the output
-        # of "git push" actually goes to stderr.
+        # of "git push" actually goes to stderr.  For the same reason,
+        # don't bother decoding it.
         self.git(
             "push",
             "--force" if force else None,
             "--force-with-lease" if force_with_lease else None,
             "--set-upstream" if set_upstream else None,
             remote,
-            branch if not remote_branch else "{}:{}".format(branch, remote_branch)
+            branch if not remote_branch else "{}:{}".format(branch, remote_branch),
+            decode=False
         )
 
     def username_from_url(self, input_url):
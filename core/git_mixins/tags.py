@@ -1,15 +1,17 @@
 import re
 from collections import namedtuple
-from distutils.version import LooseVersion
 
 from GitSavvy.core.git_command import mixin_base
 
 TagDetails = namedtuple("TagDetails", ("sha", "tag", "human_date", "relative_date"))
+SEMVER_TEST = re.compile(r'\d+\.\d+\.?\d*')
+LOOSE_VERSION_COMPONENTS = re.compile(r'(\d+|[a-z]+|\.)')
 
 
 MYPY = False
 if MYPY:
-    from typing import List, Optional, Tuple
+    from typing import List, Optional, Tuple, Union
+    VersionKey = Tuple[Union[int, str], ...]
 
 
 class TagsMixin(mixin_base):
@@ -43,11 +45,14 @@ class TagsMixin(mixin_base):
             "--tags",
             remote,
         )
-        porcelain_entries = stdout.splitlines()
+        # Lines look like "<sha>\trefs/tags/<tag>"
         entries = [
-            TagDetails(entry[:40], entry[51:], "", "")
-            for entry in reversed(porcelain_entries)
-            if entry
+            TagDetails(sha, ref[10:], "", "")
+            for sha, _, ref in (
+                entry.partition("\t")
+                for entry in reversed(stdout.splitlines())
+                if entry
+            )
         ]
         return self.handle_semver_tags(entries)
 
@@ -65,32 +70,57 @@ class TagsMixin(mixin_base):
         Sorts tags using LooseVersion if there's a tag matching the semver format.
         """
 
-        semver_test = re.compile(r'\d+\.\d+\.?\d*')
-
-        semver_entries, regular_entries = [], []
+        semver_entries, semver_versions, regular_entries = [], [], []
         for entry in entries:
-            if semver_test.search(entry.tag):
+            match = SEMVER_TEST.search(entry.tag)
+            if match:
                 semver_entries.append(entry)
+                semver_versions.append(match.group())
             else:
                 regular_entries.append(entry)
         if len(semver_entries):
             try:
-                semver_entries = sorted(
+                semver_entries = sort_by_keys(
                     semver_entries,
-                    key=lambda entry: LooseVersion(entry.tag),
-                    reverse=True
+                    [loose_version_key(entry.tag) for entry in semver_entries]
                 )
-            except Exception:
+            except TypeError:
                 # The error might me caused of having tags like 1.2.3.1 and 1.2.3.beta.
-                # Exception thrown is "can't convert str to int" as it is comparing
-                # 'beta' with 1.
+                # Exception thrown is "'<' not supported between 'str' and 'int'"
+                # as it is comparing 'beta' with 1.
                 # Fallback and take only the numbers as sorting key.
-                semver_entries = sorted(
+                semver_entries = sort_by_keys(
                     semver_entries,
-                    key=lambda entry: LooseVersion(
-                        semver_test.search(entry.tag).group()  # type: ignore[union-attr]
-                    ),
-                    reverse=True
+                    [loose_version_key(version) for version in semver_versions]
                 )
 
         return (regular_entries, semver_entries)
+
+
+def sort_by_keys(entries, keys):
+    # type: (List[TagDetails], List[VersionKey]) -> List[TagDetails]
+    return [
+        entry
+        for _, entry in sorted(zip(keys, entries), key=lambda pair: pair[0], reverse=True)
+    ]
+
+
+def loose_version_key(version):
+    # type: (str) -> VersionKey
+    """
+    Split a version string into a sortable tuple of numbers and strings,
+    like `distutils.version.LooseVersion` does.  (`distutils` is deprecated.)
+    """
+    return tuple(
+        _maybe_int(component)
+        for component in LOOSE_VERSION_COMPONENTS.split(version)
+        if component and component != "."
+    )
+
+
+def _maybe_int(component):
+    # type: (str) -> Union[int, str]
+    try:
+        return int(component)
+    except ValueError:
+        return component
@@ -70,6 +70,7 @@ class GlobalSettings:
         s.clear_on_change(name)
         s.add_on_change(name, self._on_update)
         self._cache = {}
+        self._git_path = s.get("git_path")
 
     def get(self, name, default=None):
         try:
@@ -83,6 +84,13 @@ class GlobalSettings:
 
     def _on_update(self):
         self._cache.clear()
+        git_path = self._settings.get("git_path")
+        if git_path != self._git_path:
+            self._git_path = git_path
+            # `git_command` memoizes the resolved binary, let it resolve
+            # again.  (Imported here as `git_command` imports us.)
+            from GitSavvy.core import git_command
+            git_command.git_path = None
 
 
 class SettingsMixin:
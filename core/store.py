@@ -3,7 +3,7 @@ from functools import partial
 import threading
 import uuid
 
-from .utils import eat_but_log_errors, Cache
+from .utils import eat_but_log_errors, LockedCache
 
 
 MYPY = False
@@ -36,7 +36,7 @@ def initial_state():
 
 
 state = defaultdict(initial_state)  # type: DefaultDict[RepoPath, RepoStore]
-cache = Cache(maxsize=512)  # type: Dict[Tuple, Any]
+cache = LockedCache(maxsize=512)  # type: Dict[Tuple, Any]
 subscribers = {}  # type: Dict[SubscriberKey, Tuple[RepoPath, Keys, Callable]]
 
 lock = threading.Lock()
@@ -1,30 +1,41 @@
 from functools import lru_cache, partial
 from collections import OrderedDict
 from contextlib import contextmanager
-import html
 from itertools import count
 import os
 import signal
 import subprocess
 import sys
 import time
+from time import perf_counter
 import threading
 import traceback
 
 import sublime
 
+from GitSavvy.core.runtime import run_on_new_thread
+
 
 MYPY = False
 if MYPY:
-    from typing import Callable, Dict, Iterator, Tuple, Type
+    from typing import (
+        Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple, Type
+    )
+    Action = NamedTuple("Action", [("description", str), ("action", Callable[[], None])])
+    ActionType = Tuple[str, Callable[[], None]]
+    QuickPanelItems = Iterable[str]
+
+else:
+    from collections import namedtuple
+    Action = namedtuple("Action", "description action")
 
 
 @contextmanager
 def print_runtime(message):
     # type: (str) -> Iterator[None]
-    start_time = time.perf_counter()
+    start_time = perf_counter()
     yield
-    end_time = time.perf_counter()
+    end_time = perf_counter()
     duration = round((end_time - start_time) * 1000)
     thread_name = threading.current_thread().name[0]
     print('{} took {}ms [{}]'.format(message, duration, thread_name))
@@ -32,11 +43,11 @@ def print_runtime(message):
 
 def measure_runtime():
     # type: () -> Callable[[str], None]
-    start_time = time.perf_counter()
+    start_time = perf_counter()
 
     def print_mark(message):
         # type: (str) -> None
-        end_time = time.perf_counter()
+        end_time = perf_counter()
         duration = round((end_time - start_time) * 1000)
         thread_name = threading.current_thread().name[0]
         print('{} after {}ms [{}]'.format(message, duration, thread_name))
@@ -46,13 +57,16 @@ def measure_runtime():
 
 class timer:
     def __init__(self):
-        self._start_time = time.perf_counter()
+        self._start_time = perf_counter()
 
     def passed(self, ms):
         # type: (int) -> bool
-        cur_time = time.perf_counter()
-        duration = (cur_time - self._start_time) * 1000
-        return duration > ms
+        # Called in tight loops, keep it cheap.
+        return (perf_counter() - self._start_time) * 1000 > ms
+
+
+LOGGED_ERRORS = {}  # type: Dict[Tuple, float]
+LOG_ERRORS_INTERVAL = 1.0  # [s]
 
 
 @contextmanager
@@ -60,8 +74,18 @@ def eat_but_log_errors(exception=Exception):
     # type: (Type[Exception]) -> Iterator[None]
     try:
         yield
-    except exception:
-        traceback.print_exc()
+    except exception as e:
+        # Some errors fire repeatedly, e.g. on every keystroke.  Only format
+        # and print the same error again after a second.
+        tb = e.__traceback__
+        while tb and tb.tb_next:
+            tb = tb.tb_next
+        key = (type(e), tb.tb_frame.f_code, tb.tb_lineno) if tb else (type(e),)
+        now = time.monotonic()
+        last_logged = LOGGED_ERRORS.get(key)
+        if last_logged is None or now - last_logged >= LOG_ERRORS_INTERVAL:
+            LOGGED_ERRORS[key] = now
+            traceback.print_exc()
 
 
 def hprint(msg):
@@ -74,17 +98,42 @@ def hprint(msg):
     print(msg)
 
 
+STATUS_MESSAGES = {}  # type: Dict[sublime.WindowId, Tuple[sublime.Window, str]]
+STATUS_MESSAGES_LOCK = threading.Lock()
+STATUS_MESSAGE_DELAY = 80  # [ms]
+
+
 def flash(view, message):
     # type: (sublime.View, str) -> None
     """ Flash status message on view's window. """
     window = view.window()
     if window:
-        window.status_message(message)
-
-
-IDS = partial(next, count())  # type: Callable[[], int]  # type: ignore[assignment]
-HIDE_POPUP_TIMERS = {}  # type: Dict[sublime.ViewId, int]
-POPUPS = {}  # type: Dict[sublime.ViewId, Tuple]
+        # Coalesce bursts of messages as only the last one would be
+        # readable anyway.
+        # `flash` is also called from the worker, thus guard the
+        # bookkeeping as the flush runs on the UI thread.
+        wid = window.id()
+        with STATUS_MESSAGES_LOCK:
+            scheduled = wid in STATUS_MESSAGES
+            STATUS_MESSAGES[wid] = (window, message)
+        if not scheduled:
+            sublime.set_timeout(partial(_flush_status_message, wid), STATUS_MESSAGE_DELAY)
+
+
+def _flush_status_message(wid):
+    # type: (sublime.WindowId) -> None
+    with STATUS_MESSAGES_LOCK:
+        try:
+            window, message = STATUS_MESSAGES.pop(wid)
+        except KeyError:
+            return
+    window.status_message(message)
+
+
+IDS = count().__next__  # type: Callable[[], int]
+POPUPS = {}  # type: Dict[sublime.ViewId, _PopupState]
+VIEWPORT_INFO = {}  # type: Dict[sublime.ViewId, Tuple[int, float, float, int]]
+VIEWPORT_INFO_TTL = 0.05  # [s]
 DEFAULT_TIMEOUT = 2500  # [ms]
 DEFAULT_STYLE = {
     'background': 'transparent',
@@ -92,104 +141,174 @@ DEFAULT_STYLE = {
 }
 
 
+class _PopupState:
+    __slots__ = ("key", "content", "hide_id")
+
+    def __init__(self, key, content):
+        # type: (Tuple[int, int], str) -> None
+        # `key` identifies the popup by its width and location, `hide_id`
+        # the toast which is allowed to hide it.
+        self.key = key
+        self.content = content
+        self.hide_id = None  # type: Optional[int]
+
+
 def show_toast(view, message, timeout=DEFAULT_TIMEOUT, style=DEFAULT_STYLE):
     # type: (sublime.View, str, int, Dict[str, str]) -> Callable[[], None]
     """Show a toast popup at the bottom of the view.
 
     A timeout of -1 makes a "sticky" toast.
     """
-    messages_by_line = escape_text(message).splitlines()
-    content = style_message("<br />".join(messages_by_line), style)
+    messages_by_line = _escape_and_split(message)
+    content = _style_message_cached(
+        "<br />".join(messages_by_line), style["background"], style["foreground"]
+    )
+
+    width, last_row = _viewport_info(view)
+    line_start = view.text_point(last_row - 4 - len(messages_by_line), 0)
+
+    toast = _Toast(view.id(), IDS())
+    toast.sink = show_popup(
+        view,
+        content,
+        max_width=width * 2 / 3,
+        location=line_start
+    )
+    POPUPS[toast.vid].hide_id = toast.hide_id
+
+    if timeout > 0:
+        sublime.set_timeout(toast.hide, timeout)
+    return toast.hide
+
+
+def _viewport_info(view):
+    # type: (sublime.View) -> Tuple[float, int]
+    """Return the width and the last visible row of the viewport."""
+    # Toasts often come in bursts, reuse the values for a short while.
+    vid, change_count, now = view.id(), view.change_count(), time.monotonic()
+    try:
+        cc, timestamp, width, last_row = VIEWPORT_INFO[vid]
+    except KeyError:
+        pass
+    else:
+        if cc == change_count and now - timestamp < VIEWPORT_INFO_TTL:
+            return width, last_row
 
     # Order can matter here.  If we calc width *after* visible_region we get
     # different results!
     width, _ = view.viewport_extent()
     visible_region = view.visible_region()
     last_row, _ = view.rowcol(visible_region.end())
-    line_start = view.text_point(last_row - 4 - len(messages_by_line), 0)
+    VIEWPORT_INFO[vid] = (change_count, now, width, last_row)
+    return width, last_row
 
-    vid = view.id()
-    key = IDS()
 
-    def on_hide(vid, key):
-        if HIDE_POPUP_TIMERS.get(vid) == key:
-            HIDE_POPUP_TIMERS.pop(vid, None)
+class _Toast:
+    __slots__ = ("vid", "hide_id", "sink")
 
-    def __hide_popup(vid, key, sink):
-        if HIDE_POPUP_TIMERS.get(vid) == key:
-            HIDE_POPUP_TIMERS.pop(vid, None)
-            sink()
+    def __init__(self, vid, hide_id):
+        # type: (sublime.ViewId, int) -> None
+        self.vid = vid
+        self.hide_id = hide_id
+        self.sink = lambda: None  # type: Callable[[], None]
 
-    inner_hide_popup = show_popup(
-        view,
-        content,
-        max_width=width * 2 / 3,
-        location=line_start,
-        on_hide=partial(on_hide, vid, key)
-    )
-    HIDE_POPUP_TIMERS[vid] = key
-
-    hide_popup = partial(__hide_popup, vid, key, inner_hide_popup)
-    if timeout > 0:
-        sublime.set_timeout(hide_popup, timeout)
-    return hide_popup
+    def hide(self):
+        # type: () -> None
+        state = POPUPS.get(self.vid)
+        if state and state.hide_id == self.hide_id:
+            self.sink()
 
 
 def show_popup(view, content, max_width, location, on_hide=None):
-    vid = view.id()
-    inner_hide_popup = view.hide_popup
-    actual_key = (int(max_width), location)
-    if POPUPS.get(vid) == actual_key:
-        view.update_popup(content)
+    popup = _Popup(view.id(), (int(max_width), location), view.hide_popup, on_hide)
+    state = POPUPS.get(popup.vid)
+    if state and state.key == popup.key:
+        # Sublime re-renders the popup on every update, skip if unchanged.
+        if state.content != content:
+            view.update_popup(content)
+            state.content = content
     else:
-        def __on_hide(vid, key):
-            if POPUPS.get(vid) == key:
-                POPUPS.pop(vid, None)
-            if on_hide:
-                on_hide()
-
         view.show_popup(
             content,
             max_width=max_width,
             location=location,
-            on_hide=partial(__on_hide, vid, actual_key)
+            on_hide=popup.on_hide
         )
-        POPUPS[vid] = actual_key
+        POPUPS[popup.vid] = _PopupState(popup.key, content)
+
+    return popup.hide
+
+
+class _Popup:
+    __slots__ = ("vid", "key", "sink", "on_hide_")
 
-    def __hide_popup(vid, key, sink):
-        if POPUPS.get(vid) == key:
-            POPUPS.pop(vid, None)
-            sink()
+    def __init__(self, vid, key, sink, on_hide):
+        # type: (sublime.ViewId, Tuple[int, int], Callable[[], None], Optional[Callable[[], None]]) -> None
+        self.vid = vid
+        self.key = key
+        self.sink = sink
+        self.on_hide_ = on_hide
 
-    return partial(__hide_popup, vid, actual_key, inner_hide_popup)
+    def _forget(self):
+        # type: () -> bool
+        state = POPUPS.get(self.vid)
+        if state and state.key == self.key:
+            POPUPS.pop(self.vid, None)
+            return True
+        return False
+
+    def on_hide(self):
+        # type: () -> None
+        self._forget()
+        if self.on_hide_:
+            self.on_hide_()
+
+    def hide(self):
+        # type: () -> None
+        if self._forget():
+            self.sink()
+
+
+MESSAGE_TEMPLATE = """
+    <div
+        style="padding: 1rem;
+               background-color: {};
+               color: {}"
+    >{}</div>
+"""
 
 
 def style_message(message, style):
     # type: (str, Dict[str, str]) -> str
-    return """
-        <div
-            style="padding: 1rem;
-                   background-color: {background};
-                   color: {foreground}"
-        >{message}</div>
-    """.format(message=message, **style)
+    return MESSAGE_TEMPLATE.format(style['background'], style['foreground'], message)
+
+
+# Same as `html.escape(text, quote=False)` plus non-breaking spaces
+# but in one pass.
+ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    " ": "&nbsp;",
+})
 
 
 def escape_text(text):
     # type: (str) -> str
-    return html.escape(text, quote=False).replace(" ", "&nbsp;")
+    return text.translate(ESCAPE_TABLE)
 
 
-MYPY = False
-if MYPY:
-    from typing import Iterable, Sequence, NamedTuple
-    Action = NamedTuple("Action", [("description", str), ("action", Callable[[], None])])
-    ActionType = Tuple[str, Callable[[], None]]
-    QuickPanelItems = Iterable[str]
+# Toasts show the same few messages over and over, memoize their HTML.
+@lru_cache(maxsize=256)
+def _escape_and_split(text):
+    # type: (str) -> Tuple[str, ...]
+    return tuple(escape_text(text).splitlines())
 
-else:
-    from collections import namedtuple
-    Action = namedtuple("Action", "description action")
+
+@lru_cache(maxsize=256)
+def _style_message_cached(message, background, foreground):
+    # type: (str, str, str) -> str
+    return style_message(message, {"background": background, "foreground": foreground})
 
 
 def show_panel(
@@ -210,14 +329,19 @@ def show_panel(
             on_done(idx)
 
     # `on_highlight` also gets called `on_done`. We
-    # reduce the side-effects here using `lru_cache`.
-    @lru_cache(1)
+    # reduce the side-effects here by remembering the last index.
+    last_idx = None  # type: Optional[int]
+
     def _on_highlight(idx):
         # type: (int) -> None
+        nonlocal last_idx
+        if idx == last_idx:
+            return
+        last_idx = idx
         on_highlight(idx)
 
     window.show_quick_panel(
-        list(items),
+        items if isinstance(items, list) else list(items),
         _on_done,
         on_highlight=_on_highlight,
         selected_index=selected_index,
@@ -234,7 +358,7 @@ def show_actions_panel(window, actions, select=-1):
 
     show_panel(
         window,
-        (action[0] for action in actions),
+        [action[0] for action in actions],
         on_selection,
         selected_index=select
     )
@@ -276,7 +400,11 @@ else:
 
 def line_indentation(line):
     # type: (str) -> int
-    return len(line) - len(line.lstrip())
+    return len(line) - len(line.lstrip(" \t"))
+
+
+CREATE_NO_WINDOW = 0x08000000  # `subprocess.CREATE_NO_WINDOW` is Python 3.7+
+KILL_GRACE_PERIOD = 2  # [s]
 
 
 def kill_proc(proc):
@@ -287,10 +415,37 @@ def kill_proc(proc):
         startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
         subprocess.Popen(
             "taskkill /PID %d /T /F" % proc.pid,
-            startupinfo=startupinfo)
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            startupinfo=startupinfo,
+            creationflags=CREATE_NO_WINDOW)
     else:
-        os.killpg(proc.pid, signal.SIGTERM)
-        proc.terminate()
+        # Only signal the whole group if the process leads its own group,
+        # otherwise we would signal Sublime Text itself.  Send just one
+        # signal as `terminate` would signal the same process again.
+        try:
+            if os.getpgid(proc.pid) == proc.pid:
+                os.killpg(proc.pid, signal.SIGTERM)
+                kill = partial(os.killpg, proc.pid, signal.SIGKILL)
+            else:
+                proc.terminate()
+                kill = proc.kill
+        except ProcessLookupError:
+            return  # already gone
+        # Escalate if the process ignores SIGTERM.  Wait on a separate
+        # thread as we're usually called from the UI thread.
+        run_on_new_thread(_kill_after_grace_period, proc, kill)
+
+
+def _kill_after_grace_period(proc, kill):
+    # type: (subprocess.Popen, Callable[[], None]) -> None
+    try:
+        proc.wait(KILL_GRACE_PERIOD)
+    except subprocess.TimeoutExpired:
+        try:
+            kill()
+        except ProcessLookupError:
+            pass
 
 
 # `realpath` also supports `bytes` and we don't, hence the indirection
@@ -322,16 +477,40 @@ else:
     resolve_path = _resolve_path
 
 
+# Resolving touches the file system for every part of the path, and we
+# do this for the same few paths over and over.
+resolve_path = lru_cache(maxsize=1024)(resolve_path)
+
+
 def paths_upwards(path):
     # type: (str) -> Iterator[str]
-    while True:
-        yield path
-        path, name = os.path.split(path)
-        if not name or path == "/":
-            break
+    yield from _paths_upwards(path)
+
+
+@lru_cache(maxsize=None)  # bounded by the folders we search repos in
+def _paths_upwards(path):
+    # type: (str) -> Tuple[str, ...]
+    paths = []
+    if os.altsep:
+        # Let `os.path` deal with drives and the two separators on Windows.
+        while True:
+            paths.append(path)
+            path, name = os.path.split(path)
+            if not name or path == "/":
+                break
+    else:
+        while True:
+            paths.append(path)
+            idx = path.rfind("/")
+            if idx <= 0:
+                break
+            path = path[:idx]
+    return tuple(paths)
 
 
 class Cache(OrderedDict):
+    """LRU cache.  Use `LockedCache` if it is shared between threads."""
+
     def __init__(self, maxsize=128):
         assert maxsize > 0
         self.maxsize = maxsize
@@ -342,9 +521,32 @@ class Cache(OrderedDict):
         self.move_to_end(key)
         return value
 
+    def get(self, key, default=None):
+        # `dict.get` bypasses `__getitem__` and would thus not mark the
+        # key as recently used.
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
     def __setitem__(self, key, value):
-        if key in self:
-            self.move_to_end(key)
         super().__setitem__(key, value)
+        self.move_to_end(key)
         if len(self) > self.maxsize:
             self.popitem(last=False)
+
+
+class LockedCache(Cache):
+    def __init__(self, maxsize=128):
+        # Reentrant, as `popitem` of the C implementation calls back
+        # into `__getitem__` for subclasses.
+        self._lock = threading.RLock()
+        super().__init__(maxsize)
+
+    def __getitem__(self, key):
+        with self._lock:
+            return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)